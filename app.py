@@ -1,23 +1,170 @@
-import os, json, re, dotenv, google.generativeai as genai
+import os, sys, json, re, dotenv, importlib
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 import socket
+import gzip
 from functools import lru_cache
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
 import threading
+import queue
+import uuid
+import tempfile
+from contextlib import contextmanager
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 dotenv.load_dotenv()
 
 GEN_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEN_API_KEY)
+
+# Build the Gemini client during worker warm-up. Set WARM_GEMINI=0 for workers
+# that only serve static assets or availability checks, so they never load it.
+WARM_GEMINI = os.getenv("WARM_GEMINI", "1") == "1"
+
+# Seconds spent importing heavy dependencies on first use (see lazy_import)
+import_timings = {}
 
 MODEL_NAME = "gemini-2.5-flash"
 N_SUGGESTIONS = 60
+DEFAULT_EXTENSIONS = ['.com', '.ma', '.net', '.org', '.info', '.me', '.net.ma']
+
+# Popular-query prewarming: keep results for the most requested
+# (idea, style, extensions) keys in memory and refresh them in the background.
+# Each worker refreshes its own copy, so budgets apply per worker.
+PREWARM_POPULAR = os.getenv("PREWARM_POPULAR", "0") == "1"
+PREWARM_TOP_K = int(os.getenv("PREWARM_TOP_K", 20))
+PREWARM_MIN_HITS = int(os.getenv("PREWARM_MIN_HITS", 3))
+PREWARM_TTL = int(os.getenv("PREWARM_TTL", 1800))
+PREWARM_INTERVAL = int(os.getenv("PREWARM_INTERVAL", 300))
+PREWARM_MAX_REFRESHES = int(os.getenv("PREWARM_MAX_REFRESHES", 5))
+# Refreshes run off the request path, so they wait for (nearly) every
+# availability check instead of using the request deadline
+PREWARM_CHECK_DEADLINE = float(os.getenv("PREWARM_CHECK_DEADLINE", 60))
+# JSON list of [idea, style, [extensions]] treated as hot from startup
+PREWARM_SEEDS = json.loads(os.getenv("PREWARM_SEEDS", "[]"))
+
+# Paginated results: the full ranked result set is kept server-side under a
+# result id and served page by page from /api/results/<result_id>. Sets are
+# files in RESULT_STORE_DIR so every gunicorn worker on the host can serve them.
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+RESULT_STORE_DIR = os.getenv("RESULT_STORE_DIR", os.path.join(tempfile.gettempdir(), "ai-domain-results"))
+RESULT_TTL = int(os.getenv("RESULT_TTL", 1800))
+RESULT_STORE_SIZE = int(os.getenv("RESULT_STORE_SIZE", 500))
+# Extra generate-and-check rounds a result set may run once its pages run out
+MAX_GENERATION_ROUNDS = int(os.getenv("MAX_GENERATION_ROUNDS", 2))
+
+# Response encoding: compress text responses above COMPRESS_MIN_SIZE bytes with
+# brotli (when installed) or gzip, and let browsers cache static assets
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 500))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "text/html", "text/css", "text/javascript", "application/javascript"
+}
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", 3600))
+
+# Compressed static assets keyed by (path, ETag, encoding), so each file is
+# compressed once per version rather than on every request
+compressed_static = {}
+compressed_static_lock = threading.Lock()
+
+# "compact" asks Gemini for a schema-constrained JSON array of domain strings
+# with a trimmed prompt and an output budget sized to n; "classic" uses PROMPT.
+GENERATION_MODE = os.getenv("GENERATION_MODE", "compact")
+COMPACT_TOKENS_PER_DOMAIN = int(os.getenv("COMPACT_TOKENS_PER_DOMAIN", 12))
+# gemini-2.5 counts thinking tokens against max_output_tokens, so leave headroom
+COMPACT_TOKEN_HEADROOM = int(os.getenv("COMPACT_TOKEN_HEADROOM", 1024))
+# A capped response salvaging fewer than this share of n domains is retried uncapped
+COMPACT_MIN_YIELD = float(os.getenv("COMPACT_MIN_YIELD", 0.75))
+
+# Running token totals across generation calls (see report_usage)
+generation_stats = {"calls": 0, "tokens_in": 0, "tokens_out": 0}
+stats_lock = threading.Lock()
+
+# Micro-batching: combine suggestion requests arriving within BATCH_MAX_WAIT_MS
+# into a single Gemini call (see SuggestionBatcher)
+SUGGESTION_BATCHING = os.getenv("SUGGESTION_BATCHING", "0") == "1"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 4))
+BATCH_MAX_WAIT_MS = int(os.getenv("BATCH_MAX_WAIT_MS", 200))
 
 # Simple cache for domain availability checks
 domain_cache = {}
 cache_lock = threading.Lock()
 
+# Gemini client, built once per worker process (see get_model / init_worker)
+_model = None
+_model_lock = threading.Lock()
+
+# WHOIS registry table: extension suffix -> (server, timeout). Longest suffix wins.
+WHOIS_SERVERS = {
+    ".co.ma": ("whois.registre.ma", 8),
+    ".net.ma": ("whois.registre.ma", 8),
+    ".org.ma": ("whois.registre.ma", 8),
+    ".ac.ma": ("whois.registre.ma", 8),
+    ".press.ma": ("whois.registre.ma", 8),
+    ".gov.ma": ("whois.registre.ma", 8),
+    ".ma": ("whois.registre.ma", 8),  # Shorter timeout for .ma domains
+    ".com": ("whois.verisign-grs.com", 5),
+    ".net": ("whois.verisign-grs.com", 5),
+    ".org": ("whois.pir.org", 5),
+    ".info": ("whois.afilias.net", 5),
+    ".me": ("whois.nic.me", 5),
+}
+DEFAULT_WHOIS_SERVER = ("whois.registre.ma", 8)
+_WHOIS_SUFFIXES = sorted(WHOIS_SERVERS, key=len, reverse=True)
+
+# Availability checks return whatever has finished by AVAILABILITY_DEADLINE
+# seconds; the rest are reported as unknown and finish in the background,
+# filling domain_cache. A check running past its server's p95 latency gets
+# one hedged duplicate query.
+AVAILABILITY_DEADLINE = float(os.getenv("AVAILABILITY_DEADLINE", 4))
+# Lookups one request may have in flight at once, hedges included
+WHOIS_CONCURRENCY_PER_REQUEST = int(os.getenv("WHOIS_CONCURRENCY_PER_REQUEST", 15))
+# A full per-request share for every request thread (GUNICORN_THREADS, see
+# gunicorn.conf.py), so concurrent searches don't queue behind each other
+WHOIS_MAX_WORKERS = int(os.getenv(
+    "WHOIS_MAX_WORKERS", int(os.getenv("GUNICORN_THREADS", 8)) * WHOIS_CONCURRENCY_PER_REQUEST
+))
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", 2))
+# How often to look again at checks still queued in the pool
+HEDGE_POLL_INTERVAL = 0.1
+MAX_HEDGES_PER_REQUEST = int(os.getenv("MAX_HEDGES_PER_REQUEST", 10))
+
+# Shared by all requests so checks can outlive the request that started them
+_whois_executor = None
+_whois_executor_lock = threading.Lock()
+_inflight_checks = {}  # domain -> Future of the check already running for it
+_inflight_lock = threading.Lock()
+whois_latencies = {}  # WHOIS server -> recent lookup durations in seconds
+latency_lock = threading.Lock()
+
+AVAILABILITY_INDICATORS = (
+    'no match', 'not found', 'no entries found', 'status: free',
+    'no data found', 'not registered', 'available'
+)
+
+UNAVAILABLE_INDICATORS = (
+    'creation date', 'created on', 'registered on', 'registration date',
+    'domain status: ok', 'status: active', 'registrar:'
+)
+
 # Style prompts for different domain generation styles
 STYLE_PROMPTS = {
     "default": (
@@ -89,39 +236,103 @@ Return as JSON array:
 Remember: DISTRIBUTE EVENLY across: {extensions_str}"""
 
 
-def is_domain_available_fast(domain: str) -> bool:
+COMPACT_PROMPT = """{n} brandable domain names for: {idea}
+Style: {style_prompt}
+Extensions, ONLY these, spread evenly: {extensions_str}
+Name part: max 25 chars, a-z 0-9 and inner hyphens, no country names unless part of a brand.
+Return a JSON array of domain strings."""
+
+DOMAIN_PATTERN = re.compile(
+    r'(?<![\w.-])[a-z0-9](?:[a-z0-9-]{0,23}[a-z0-9])?(?:\.[a-z]{2,})+(?![\w-])', re.IGNORECASE
+)
+
+
+BATCH_PROMPT = """Generate domain names for each of these {count} businesses.
+
+{businesses}
+
+CRITICAL REQUIREMENTS (apply to every business):
+- Use ONLY that business's extensions and DISTRIBUTE EVENLY across them
+- Follow that business's style
+- DOMAIN NAME RULES:
+  - Maximum 25 characters for the name (before the extension).
+  - Must only contain letters (a-z), numbers (0-9), and hyphens (-).
+  - Hyphens cannot be at the start or end of a name.
+  - DO NOT use country names as part of the domain, unless it is a part of a brand name.
+  - The name must be a single word or a short, memorable phrase.
+
+Return ONE JSON object keyed by business id, each value a JSON array of domains:
+{{"1": ["example.com", "startup.ma"], "2": ["business.net"]}}"""
+
+BATCH_ITEM_PROMPT = """[id {id}] Business: {idea}
+Count: {n} domains. Extensions: {extensions_str}
+Style: {style_prompt}"""
+
+
+def lazy_import(module_name):
+    """Import a heavy dependency on first use and record how long it took"""
+    module = sys.modules.get(module_name)
+    if module is None:
+        start_time = time.perf_counter()
+        module = importlib.import_module(module_name)
+        import_timings[module_name] = time.perf_counter() - start_time
+        print(f"Lazily imported {module_name} in {import_timings[module_name]:.2f} seconds")
+    return module
+
+
+def get_model():
+    """Return the process-wide Gemini model, creating it on first use"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                # google.generativeai pulls in grpc, protobuf and the API client stack
+                genai = lazy_import("google.generativeai")
+                genai.configure(api_key=GEN_API_KEY)
+                _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
+
+
+def get_whois_server(domain: str):
+    """Look up (server, timeout) for a domain in the WHOIS registry table"""
+    domain_lower = domain.lower()
+    for suffix in _WHOIS_SUFFIXES:
+        if domain_lower.endswith(suffix):
+            return WHOIS_SERVERS[suffix]
+    return DEFAULT_WHOIS_SERVER
+
+
+def init_worker():
     """
-    Fast domain availability check with optimized timeouts
+    Per-worker warm-up: build the Gemini client and compile the page
+    template once, before the first request.
     """
-    with cache_lock:
-        if domain in domain_cache:
-            return domain_cache[domain]
+    start_time = time.time()
+    if WARM_GEMINI:
+        get_model()
+    app.jinja_env.get_template("index.html")
+    if popular_queries is not None:
+        popular_queries.start()
+    print(f"Worker {os.getpid()} initialized in {time.time() - start_time:.2f} seconds")
 
-    try:
-        domain_lower = domain.lower()
 
+def is_domain_available_fast(domain: str, use_cache: bool = True) -> bool:
+    """
+    Fast domain availability check with optimized timeouts.
+    With use_cache=False the lookup always goes to the network; the answer
+    still replaces the cached one.
+    """
+    if use_cache:
+        with cache_lock:
+            if domain in domain_cache:
+                return domain_cache[domain]
+
+    try:
         # Determine WHOIS server based on extension
-        if domain_lower.endswith('.ma') or any(domain_lower.endswith(ext) for ext in
-                                               ['.co.ma', '.net.ma', '.org.ma', '.ac.ma', '.press.ma', '.gov.ma']):
-            whois_server = 'whois.registre.ma'
-            timeout = 8  # Shorter timeout for .ma domains
-        elif domain_lower.endswith('.com') or domain_lower.endswith('.net'):
-            whois_server = 'whois.verisign-grs.com'
-            timeout = 5
-        elif domain_lower.endswith('.org'):
-            whois_server = 'whois.pir.org'
-            timeout = 5
-        elif domain_lower.endswith('.info'):
-            whois_server = 'whois.afilias.net'
-            timeout = 5
-        elif domain_lower.endswith('.me'):
-            whois_server = 'whois.nic.me'
-            timeout = 5
-        else:
-            whois_server = 'whois.registre.ma'
-            timeout = 8
+        whois_server, timeout = get_whois_server(domain)
 
         port = 43
+        lookup_start = time.monotonic()
 
         # Create socket connection with optimized timeout
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -149,24 +360,16 @@ def is_domain_available_fast(domain: str) -> bool:
 
             response_text = response.decode('utf-8', errors='ignore').lower()
 
-            # Check for availability indicators
-            availability_indicators = [
-                'no match', 'not found', 'no entries found', 'status: free',
-                'no data found', 'not registered', 'available'
-            ]
-
-            unavailable_indicators = [
-                'creation date', 'created on', 'registered on', 'registration date',
-                'domain status: ok', 'status: active', 'registrar:'
-            ]
-
             # Determine availability
-            is_available = any(indicator in response_text for indicator in availability_indicators)
+            is_available = any(indicator in response_text for indicator in AVAILABILITY_INDICATORS)
 
             if not is_available:
-                has_unavailable_indicator = any(indicator in response_text for indicator in unavailable_indicators)
+                has_unavailable_indicator = any(indicator in response_text for indicator in UNAVAILABLE_INDICATORS)
                 is_available = not has_unavailable_indicator
 
+            # Only completed network lookups feed the hedging latency samples
+            record_whois_latency(whois_server, time.monotonic() - lookup_start)
+
             with cache_lock:
                 domain_cache[domain] = is_available
             return is_available
@@ -181,23 +384,177 @@ def is_domain_available_fast(domain: str) -> bool:
         return False
 
 
-def check_domains_parallel_fast(domains_list, max_workers=10):
-    """Check multiple domains in parallel with higher concurrency"""
+def get_whois_executor():
+    """Return the process-wide WHOIS thread pool, creating it on first use"""
+    global _whois_executor
+    if _whois_executor is None:
+        with _whois_executor_lock:
+            if _whois_executor is None:
+                _whois_executor = ThreadPoolExecutor(max_workers=WHOIS_MAX_WORKERS, thread_name_prefix="whois")
+    return _whois_executor
+
+
+def record_whois_latency(server, seconds):
+    with latency_lock:
+        whois_latencies.setdefault(server, deque(maxlen=200)).append(seconds)
+
+
+def hedge_delays():
+    """Seconds to wait on a check before hedging it, per WHOIS server: its p95 latency"""
+    with latency_lock:
+        snapshot = {server: sorted(samples) for server, samples in whois_latencies.items()}
+    return {
+        server: samples[min(int(len(samples) * HEDGE_PERCENTILE), len(samples) - 1)]
+        for server, samples in snapshot.items()
+        if len(samples) >= HEDGE_MIN_SAMPLES
+    }
+
+
+def _submit_check(domain, use_cache=True):
+    """Start a check for domain, or join the one another request already started"""
+    with _inflight_lock:
+        # A check in flight is a network lookup either way, so it is fresh enough to join
+        future = _inflight_checks.get(domain)
+        if future is not None:
+            return future
+        future = get_whois_executor().submit(is_domain_available_fast, domain, use_cache)
+        _inflight_checks[domain] = future
+
+    def _forget(done_future):
+        with _inflight_lock:
+            if _inflight_checks.get(domain) is done_future:
+                del _inflight_checks[domain]
+
+    future.add_done_callback(_forget)
+    return future
+
+
+def _drain_checks(waiting, in_flight, max_concurrency, use_cache=True):
+    """
+    Keep checking the domains a request gave up on at its deadline, with the
+    same concurrency limit, so their answers still land in domain_cache
+    """
+    in_flight = {future for future in in_flight if not future.done()}
+    while waiting or in_flight:
+        while waiting and len(in_flight) < max_concurrency:
+            domain = waiting.popleft()
+            if use_cache:
+                with cache_lock:
+                    if domain in domain_cache:
+                        continue
+            in_flight.add(_submit_check(domain, use_cache))
+        if in_flight:
+            _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+
+def check_domains_parallel_fast(domains_list, deadline=AVAILABILITY_DEADLINE,
+                                max_concurrency=WHOIS_CONCURRENCY_PER_REQUEST, use_cache=True):
+    """
+    Check multiple domains in parallel and return {domain: True/False/None}.
+    None means the check did not finish within deadline seconds; it keeps
+    running in the background and its answer lands in domain_cache.
+    At most max_concurrency checks (hedges included) are in flight for this
+    request; the rest wait their turn here rather than in the shared pool.
+    use_cache=False rechecks every domain instead of trusting domain_cache.
+    """
     results = {}
+    waiting = deque()
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_domain = {
-            executor.submit(is_domain_available_fast, domain): domain
-            for domain in domains_list
-        }
+    for domain in dict.fromkeys(domains_list):
+        if use_cache:
+            with cache_lock:
+                if domain in domain_cache:
+                    results[domain] = domain_cache[domain]
+                    continue
+        waiting.append(domain)
+
+    pending = {}  # future -> domain; a hedged domain has two futures
+    submitted_at = {}  # future -> when this request handed it to the pool
+    start_time = time.monotonic()
+    end_time = start_time + deadline
+    hedged = set()
+
+    while waiting or pending:
+        while waiting and len(pending) < max_concurrency:
+            domain = waiting.popleft()
+            future = _submit_check(domain, use_cache)
+            pending[future] = domain
+            submitted_at[future] = time.monotonic()
+
+        now = time.monotonic()
+        if now >= end_time:
+            break
+
+        # Hedge checks that have been running longer than their server's p95.
+        # Checks still queued in the pool are not hedged; a duplicate would
+        # only queue behind them.
+        next_wake = end_time
+        delays = hedge_delays()
+        for future, domain in sorted(pending.items(), key=lambda item: submitted_at[item[0]]):
+            if len(hedged) >= MAX_HEDGES_PER_REQUEST:
+                break
+            if domain in hedged or future not in pending:
+                continue
+            if not future.running():
+                next_wake = min(next_wake, now + HEDGE_POLL_INTERVAL)
+                continue
+            hedge_at = submitted_at[future] + delays.get(get_whois_server(domain)[0], HEDGE_DEFAULT_DELAY)
+            if hedge_at > now:
+                next_wake = min(next_wake, hedge_at)
+                continue
+            if len(pending) >= max_concurrency:
+                # A slot frees up when something completes, which wakes us
+                continue
+
+            cached = None
+            if use_cache:
+                with cache_lock:
+                    cached = domain_cache.get(domain)
+            if cached is not None:
+                # Another copy finished in the meantime; no need to ask again
+                results[domain] = cached
+                for other in [f for f, d in pending.items() if d == domain]:
+                    del pending[other]
+                continue
+
+            hedged.add(domain)
+            print(f"Hedging WHOIS check for {domain} after {now - submitted_at[future]:.2f} seconds")
+            hedge = get_whois_executor().submit(is_domain_available_fast, domain, use_cache)
+            pending[hedge] = domain
+            submitted_at[hedge] = now
+
+        if not pending:
+            continue
 
-        for future in as_completed(future_to_domain):
-            domain = future_to_domain[future]
+        done, _ = wait(list(pending), timeout=max(next_wake - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            domain = pending.pop(future, None)
+            if domain is None or domain in results:
+                continue
             try:
                 results[domain] = future.result()
             except Exception as e:
                 print(f"Error checking {domain}: {e}")
                 results[domain] = False
+            # First answer wins; stop waiting on the other copy
+            for other in [f for f, d in pending.items() if d == domain]:
+                del pending[other]
+
+    if waiting:
+        # Domains that never got a slot are handed to a background drainer,
+        # so every domain reported unknown has a lookup queued
+        threading.Thread(
+            target=_drain_checks, args=(waiting, list(pending), max_concurrency, use_cache),
+            name="whois-drain", daemon=True
+        ).start()
+
+    unknown = set(pending.values()) | set(waiting)
+    for domain in unknown:
+        results[domain] = None
+
+    if unknown:
+        print(f"Deadline of {deadline:.1f}s reached with {len(unknown)} checks unfinished; reporting them as unknown")
 
     return results
 
@@ -224,12 +581,101 @@ def validate_domain_extensions(domains, allowed_extensions):
     return valid_domains
 
 
-def suggest_domains(idea: str, style: str = "default", extensions: list = None, n: int = N_SUGGESTIONS):
-    if not extensions:
-        extensions = ['.com', '.ma', '.net', '.org', '.info', '.me', '.net.ma']
+def finalize_domains(domains, idea, style, extensions, n):
+    """Validate parsed domains, falling back when there are too few or they are badly distributed"""
+    valid_domains = validate_domain_extensions(domains, extensions)
+    print(f"After validation: {len(valid_domains)} domains with correct extensions")
+
+    extension_counts = {}
+    for domain_obj in valid_domains:
+        domain = domain_obj["domain"]
+        # Use the robust extract_extension function
+        ext = "." + extract_extension(domain)
+        extension_counts[ext] = extension_counts.get(ext, 0) + 1
+
+    print(f"Extension distribution: {extension_counts}")
+
+    # If we have good distribution and enough domains, return them
+    if len(valid_domains) >= 5 and len(extension_counts) >= min(2, len(extensions)):
+        return valid_domains
+    else:
+        print("Poor distribution or not enough domains, using enhanced fallback")
+        return generate_enhanced_fallback_domains(idea, style, extensions, n)
+
+
+def compact_max_output_tokens(n):
+    """Output token budget for a compact request of n domains"""
+    return n * COMPACT_TOKENS_PER_DOMAIN + COMPACT_TOKEN_HEADROOM
+
+
+def report_usage(resp, label, start_time):
+    """
+    Log tokens in/out and latency for one Gemini call and add them to
+    generation_stats. Tokens out include thinking tokens when the SDK reports
+    them, since those are billed as output too.
+    """
+    usage = getattr(resp, "usage_metadata", None)
+    tokens_in = getattr(usage, "prompt_token_count", 0) or 0
+    thinking_tokens = getattr(usage, "thoughts_token_count", 0) or 0
+    tokens_out = (getattr(usage, "candidates_token_count", 0) or 0) + thinking_tokens
+
+    with stats_lock:
+        generation_stats["calls"] += 1
+        generation_stats["tokens_in"] += tokens_in
+        generation_stats["tokens_out"] += tokens_out
+
+    print(
+        f"{label}: {tokens_in} tokens in, {tokens_out} tokens out ({thinking_tokens} thinking), "
+        f"{time.time() - start_time:.2f} seconds"
+    )
+    return tokens_in, tokens_out
+
+
+def parse_domain_list(text):
+    """
+    Parse a model response into [{"domain": ...}]. Accepts a JSON array of
+    strings or {"domain": ...} objects, optionally inside a code fence. When
+    that fails (e.g. output cut off at max_output_tokens, or one domain per
+    line) every complete domain in the text is salvaged. Returns None if
+    nothing usable is found.
+    """
+    text = text.replace('```json', '').replace('```', '').strip()
+
+    candidates = [text]
+    # Greedy, so the match spans the whole array rather than stopping at the first ']'
+    json_match = re.search(r'\[.*\]', text, re.DOTALL)
+    if json_match:
+        candidates.append(json_match.group(0))
+
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, list):
+            return [entry if isinstance(entry, dict) else {"domain": str(entry).strip()} for entry in parsed]
+
+    # Truncated JSON or newline-delimited output
+    salvaged = dict.fromkeys(match.group(0) for match in DOMAIN_PATTERN.finditer(text))
+    return [{"domain": domain} for domain in salvaged] or None
 
+
+def response_text(resp):
+    """Response text, or "" when the candidate has no parts (e.g. the whole budget went to thinking)"""
+    try:
+        return resp.text.strip()
+    except ValueError:
+        return ""
+
+
+def hit_token_limit(resp):
+    """True if generation stopped because it reached max_output_tokens"""
+    candidates = getattr(resp, "candidates", None) or []
+    return bool(candidates) and getattr(candidates[0].finish_reason, "name", "") == "MAX_TOKENS"
+
+
+def build_classic_prompt(idea, style_prompt, extensions, n):
     extensions_str = ", ".join(extensions)
-    style_prompt = get_style_prompt(style)
 
     example_ext = extensions[0] if extensions else ".com"
     example_ext2 = extensions[1] if len(extensions) > 1 else extensions[0]
@@ -241,7 +687,7 @@ def suggest_domains(idea: str, style: str = "default", extensions: list = None,
         distribution_examples.append(f"example{i + 1}{ext}")
     distribution_examples_str = ", ".join(distribution_examples)
 
-    prompt = PROMPT.format(
+    return PROMPT.format(
         idea=idea.strip(),
         style_prompt=style_prompt,
         n=n,
@@ -253,51 +699,62 @@ def suggest_domains(idea: str, style: str = "default", extensions: list = None,
         example_ext3=example_ext3
     )
 
-    print(f"Sending prompt to Gemini with style: {style}")
+
+def suggest_domains(idea: str, style: str = "default", extensions: list = None, n: int = N_SUGGESTIONS):
+    if not extensions:
+        extensions = DEFAULT_EXTENSIONS
+
+    style_prompt = get_style_prompt(style)
+
+    if GENERATION_MODE == "compact":
+        prompt = COMPACT_PROMPT.format(
+            n=n,
+            idea=idea.strip(),
+            style_prompt=style_prompt,
+            extensions_str=", ".join(extensions)
+        )
+        generation_config = {
+            "response_mime_type": "application/json",
+            "response_schema": list[str],
+            "max_output_tokens": compact_max_output_tokens(n),
+        }
+    else:
+        prompt = build_classic_prompt(idea, style_prompt, extensions, n)
+        generation_config = None
+
+    print(f"Sending {GENERATION_MODE} prompt to Gemini with style: {style}")
     print(f"Selected extensions: {extensions}")
 
     try:
-        resp = genai.GenerativeModel(MODEL_NAME).generate_content(prompt)
-        text = resp.text.strip()
+        start_time = time.time()
+        resp = get_model().generate_content(prompt, generation_config=generation_config)
+        report_usage(resp, f"Gemini {GENERATION_MODE} generation", start_time)
+        text = response_text(resp)
         print(f"Received response from Gemini: {text[:200]}...")
 
-        text = text.replace('\`\`\`json', '').replace('\`\`\`', '').strip()
+        domains = parse_domain_list(text)
 
-        # Try to find JSON array in the response
-        json_match = re.search(r'\[.*?\]', text, re.DOTALL)
-        if json_match:
-            json_text = json_match.group(0)
-            try:
-                domains = json.loads(json_text)
-                print(f"Successfully parsed {len(domains)} domains from JSON")
-
-                valid_domains = validate_domain_extensions(domains, extensions)
-                print(f"After validation: {len(valid_domains)} domains with correct extensions")
-
-                extension_counts = {}
-                for domain_obj in valid_domains:
-                    domain = domain_obj["domain"]
-                    # Use the robust extract_extension function
-                    ext = "." + extract_extension(domain)
-                    extension_counts[ext] = extension_counts.get(ext, 0) + 1
-
-                print(f"Extension distribution: {extension_counts}")
-
-                # If we have good distribution and enough domains, return them
-                if len(valid_domains) >= 5 and len(extension_counts) >= min(2, len(extensions)):
-                    return valid_domains
-                else:
-                    print("Poor distribution or not enough domains, using enhanced fallback")
-                    return generate_enhanced_fallback_domains(idea, style, extensions, n)
-
-            except json.JSONDecodeError as e:
-                print(f"JSON parsing error: {e}")
-                print("Using enhanced fallback domain generation")
-                return generate_enhanced_fallback_domains(idea, style, extensions, n)
-        else:
-            print("No JSON array found in response, using enhanced fallback")
+        # Thinking tokens count against max_output_tokens on gemini-2.5; if the
+        # cap cut the list well short of n, retry once without it rather than
+        # returning a truncated list or dropping to the fallback
+        salvaged = len(domains or [])
+        if generation_config and hit_token_limit(resp) and salvaged < n * COMPACT_MIN_YIELD:
+            print(f"Gemini hit max_output_tokens with {salvaged} of {n} domains, retrying without the cap")
+            generation_config = {key: value for key, value in generation_config.items() if key != "max_output_tokens"}
+            start_time = time.time()
+            resp = get_model().generate_content(prompt, generation_config=generation_config)
+            report_usage(resp, f"Gemini {GENERATION_MODE} generation (uncapped retry)", start_time)
+            retried = parse_domain_list(response_text(resp))
+            # Keep whichever attempt produced more
+            if len(retried or []) > salvaged:
+                domains = retried
+        if domains is None:
+            print("No domain list found in response, using enhanced fallback")
             return generate_enhanced_fallback_domains(idea, style, extensions, n)
 
+        print(f"Successfully parsed {len(domains)} domains from response")
+        return finalize_domains(domains, idea, style, extensions, n)
+
     except Exception as e:
         print(f"Error in suggest_domains: {str(e)}")
         print("Using enhanced fallback domain generation")
@@ -382,13 +839,610 @@ def generate_fallback_domains(idea, style="default", extensions=None, n=20):
     return generate_enhanced_fallback_domains(idea, style, extensions, n)
 
 
+def suggest_domains_batch(items):
+    """
+    Generate suggestions for several (idea, style, extensions, n) items with one
+    Gemini call. Returns a list aligned with items; an entry is None when that
+    item's part of the response could not be parsed.
+    """
+    businesses = "\n\n".join(
+        BATCH_ITEM_PROMPT.format(
+            id=i + 1,
+            idea=idea.strip(),
+            n=n,
+            extensions_str=", ".join(extensions),
+            style_prompt=get_style_prompt(style)
+        )
+        for i, (idea, style, extensions, n) in enumerate(items)
+    )
+    prompt = BATCH_PROMPT.format(count=len(items), businesses=businesses)
+
+    print(f"Sending batched prompt to Gemini for {len(items)} ideas")
+
+    generation_config = None
+    if GENERATION_MODE == "compact":
+        generation_config = {
+            "response_mime_type": "application/json",
+            "max_output_tokens": sum(compact_max_output_tokens(n) for _, _, _, n in items),
+        }
+
+    start_time = time.time()
+    resp = get_model().generate_content(prompt, generation_config=generation_config)
+    report_usage(resp, f"Gemini batched generation ({len(items)} ideas)", start_time)
+    text = response_text(resp)
+
+    json_match = re.search(r'\{.*\}', text, re.DOTALL)
+    if not json_match:
+        print("No JSON object found in batched response")
+        return [None] * len(items)
+
+    try:
+        keyed = json.loads(json_match.group(0))
+    except json.JSONDecodeError as e:
+        print(f"JSON parsing error in batched response: {e}")
+        return [None] * len(items)
+
+    results = []
+    for i, (idea, style, extensions, n) in enumerate(items):
+        entries = keyed.get(str(i + 1)) if isinstance(keyed, dict) else None
+        if not isinstance(entries, list):
+            print(f"Batched response has no domains for id {i + 1}")
+            results.append(None)
+            continue
+
+        domains = [
+            entry if isinstance(entry, dict) else {"domain": str(entry)}
+            for entry in entries
+        ]
+        results.append(finalize_domains(domains, idea, style, extensions, n))
+
+    return results
+
+
+class SuggestionBatcher:
+    """
+    Micro-batching layer in front of suggest_domains.
+
+    Requests arriving within max_wait seconds of each other (up to
+    max_batch_size) are sent to Gemini as one combined prompt and the
+    per-idea results are fanned back out. Any request whose part of the
+    response cannot be parsed falls back to its own suggest_domains call.
+    """
+
+    def __init__(self, max_batch_size=BATCH_MAX_SIZE, max_wait=BATCH_MAX_WAIT_MS / 1000, max_concurrent_batches=4):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_concurrent_batches = max_concurrent_batches
+        self._queue = queue.Queue()
+        self._executor = None
+        self._collector = None
+        self._start_lock = threading.Lock()
+
+    def suggest(self, idea, style="default", extensions=None, n=N_SUGGESTIONS):
+        """Queue one request and block until its batch has been answered"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((future, (idea, style, extensions or DEFAULT_EXTENSIONS, n)))
+        return future.result()
+
+    def _ensure_started(self):
+        # Started on first use so each forked worker gets its own thread
+        if self._collector is None:
+            with self._start_lock:
+                if self._collector is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_batches)
+                    self._collector = threading.Thread(target=self._collect, name="suggestion-batcher", daemon=True)
+                    self._collector.start()
+
+    def _collect(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Keep collecting the next window while this batch is in flight
+            self._executor.submit(self._process, batch)
+
+    def _process(self, batch):
+        if len(batch) == 1:
+            self._resolve_individually(*batch[0])
+            return
+
+        items = [item for _, item in batch]
+        try:
+            results = suggest_domains_batch(items)
+        except Exception as e:
+            print(f"Error in batched suggest_domains: {str(e)}")
+            results = [None] * len(batch)
+
+        for (future, item), domains in zip(batch, results):
+            if domains is None:
+                self._executor.submit(self._resolve_individually, future, item)
+            else:
+                future.set_result(domains)
+
+    @staticmethod
+    def _resolve_individually(future, item):
+        try:
+            future.set_result(suggest_domains(*item))
+        except Exception as e:
+            future.set_exception(e)
+
+
+suggestion_batcher = SuggestionBatcher() if SUGGESTION_BATCHING else None
+
+
+def request_suggestions(idea, style="default", extensions=None, n=N_SUGGESTIONS):
+    """Generate suggestions, going through the micro-batcher when it is enabled"""
+    if suggestion_batcher is not None:
+        return suggestion_batcher.suggest(idea, style, extensions, n)
+    return suggest_domains(idea, style, extensions, n)
+
+
+def run_suggestion_pipeline(idea, style, extensions, deadline=AVAILABILITY_DEADLINE, use_cache=True):
+    """
+    Generate suggestions, check availability and return the available domains,
+    sorted, followed by any whose check missed the deadline (status "unknown").
+    """
+    # Generate domains quickly with style
+    print(f"Starting fast domain generation with {style} style...")
+    raw_domains = request_suggestions(idea, style, extensions, N_SUGGESTIONS)
+    print(f"Generated {len(raw_domains)} raw domains")
+
+    # Collect all domains to check (main + alternatives)
+    all_domains_to_check = []
+
+    for domain_obj in raw_domains:
+        main_domain = domain_obj["domain"]
+        all_domains_to_check.append(main_domain)
+
+    print(f"Checking availability for {len(all_domains_to_check)} domains in parallel...")
+
+    # Check all domains in parallel, bounded by the deadline
+    availability_results = check_domains_parallel_fast(all_domains_to_check, deadline=deadline, use_cache=use_cache)
+
+    # Filter to only available domains, keeping unfinished checks at the end
+    available_domains = []
+    unknown_domains = []
+
+    for domain, is_available in availability_results.items():
+        if is_available:
+            available_domains.append({
+                "domain": domain,
+                "status": "available"
+            })
+        elif is_available is None:
+            unknown_domains.append({
+                "domain": domain,
+                "status": "unknown"
+            })
+
+    available_domains.sort(key=lambda x: x["domain"])
+    unknown_domains.sort(key=lambda x: x["domain"])
+    return available_domains + unknown_domains
+
+
+class PopularQueryCache:
+    """
+    Tracks how often each (idea, style, extensions) key is requested and keeps
+    pipeline results for the hottest ones in memory. A background thread
+    refreshes hot entries before they go stale, at most max_refreshes pipeline
+    runs every interval seconds, so hot queries skip the pipeline entirely.
+    """
+
+    def __init__(self, top_k=PREWARM_TOP_K, min_hits=PREWARM_MIN_HITS, ttl=PREWARM_TTL,
+                 interval=PREWARM_INTERVAL, max_refreshes=PREWARM_MAX_REFRESHES, seeds=PREWARM_SEEDS):
+        self.top_k = top_k
+        self.min_hits = min_hits
+        self.ttl = ttl
+        self.interval = interval
+        self.max_refreshes = max_refreshes
+        self.seeds = {self.key(idea, style, extensions) for idea, style, extensions in seeds}
+        self._counts = {}
+        self._results = {}  # key -> (timestamp, available_domains)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @staticmethod
+    def key(idea, style, extensions):
+        return idea.strip().lower(), style, tuple(sorted(extensions or DEFAULT_EXTENSIONS))
+
+    def record(self, key):
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def get(self, key):
+        """Return cached results for key if they are still fresh"""
+        with self._lock:
+            entry = self._results.get(key)
+        if entry and time.time() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def offer(self, key, available_domains):
+        """Keep freshly computed results if the key is hot"""
+        if key in self._hot_keys():
+            with self._lock:
+                self._results[key] = (time.time(), available_domains)
+
+    def _hot_keys(self):
+        with self._lock:
+            counted = [key for key, hits in self._counts.items() if hits >= self.min_hits]
+            counted.sort(key=lambda key: self._counts[key], reverse=True)
+        return set(counted[:self.top_k]) | self.seeds
+
+    def refresh_cycle(self):
+        """Refresh missing or half-expired hot entries, within the per-cycle budget"""
+        hot_keys = self._hot_keys()
+        now = time.time()
+
+        with self._lock:
+            # Forget entries that are no longer hot and decay counts so
+            # popularity follows recent traffic
+            self._results = {key: entry for key, entry in self._results.items() if key in hot_keys}
+            self._counts = {key: hits // 2 for key, hits in self._counts.items() if hits // 2 > 0}
+            stale = [
+                key for key in hot_keys
+                if key not in self._results or now - self._results[key][0] > self.ttl / 2
+            ]
+            stale.sort(key=lambda key: self._results.get(key, (0,))[0])
+
+        for key in stale[:self.max_refreshes]:
+            idea, style, extensions = key
+            with self._lock:
+                previous = self._results.get(key, (0, []))[1]
+
+            # Recheck availability over the network instead of trusting cached
+            # WHOIS answers; the cache stays in place for live requests and is
+            # overwritten as fresh answers arrive
+            try:
+                available_domains = run_suggestion_pipeline(
+                    idea, style, list(extensions), deadline=PREWARM_CHECK_DEADLINE, use_cache=False
+                )
+            except Exception as e:
+                print(f"Error refreshing popular query {key}: {str(e)}")
+                continue
+
+            previous_available = {d["domain"] for d in previous if d["status"] == "available"}
+            fresh_available = {d["domain"] for d in available_domains if d["status"] == "available"}
+            unknown_count = len(available_domains) - len(fresh_available)
+
+            with self._lock:
+                self._results[key] = (time.time(), available_domains)
+            print(
+                f"Refreshed popular query {key}: {len(fresh_available)} available "
+                f"({len(fresh_available - previous_available)} new, "
+                f"{len(previous_available - fresh_available)} dropped, {unknown_count} unknown)"
+            )
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="popular-query-refresher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh_cycle()
+            except Exception as e:
+                print(f"Error in popular query refresher: {str(e)}")
+            time.sleep(self.interval)
+
+
+popular_queries = PopularQueryCache() if PREWARM_POPULAR else None
+
+
+class ResultStore:
+    """
+    Keeps each search's full ranked result set under a result id so pages can
+    be served by cursor. Each set is a JSON file in directory, so any gunicorn
+    worker on the host can serve any page, not just the worker that ran the
+    search. When a cursor runs past the end, the next page triggers another
+    generate-and-check round for the same query. Sets expire ttl seconds after
+    their last use, and the oldest are pruned beyond max_entries.
+    """
+
+    ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+    def __init__(self, directory=RESULT_STORE_DIR, max_entries=RESULT_STORE_SIZE, ttl=RESULT_TTL,
+                 max_rounds=MAX_GENERATION_ROUNDS):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rounds = max_rounds
+        # Without fcntl (Windows) there is one process, so a thread lock will do
+        self._local_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, result_id, suffix):
+        return os.path.join(self.directory, result_id + suffix)
+
+    @contextmanager
+    def _locked(self, result_id):
+        if fcntl is None:
+            with self._local_lock:
+                yield
+            return
+        with open(self._path(result_id, ".lock"), "a") as lock_file:
+            # Closing the file releases the lock
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _save(self, result_id, entry):
+        # Write then rename, so readers never see a half-written set
+        temp_path = self._path(result_id, f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(entry, handle)
+        os.replace(temp_path, self._path(result_id, ".json"))
+
+    def _remove(self, result_id):
+        for suffix in (".json", ".lock"):
+            try:
+                os.remove(self._path(result_id, suffix))
+            except OSError:
+                pass
+
+    def _prune(self):
+        """Drop expired sets, then the least recently used beyond max_entries"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.directory, name)), name[:-len(".json")]))
+            except OSError:
+                continue
+        entries.sort()
+        excess = len(entries) - self.max_entries
+        for index, (touched, result_id) in enumerate(entries):
+            if index < excess or now - touched > self.ttl:
+                self._remove(result_id)
+
+    def create(self, idea, style, extensions, available_domains):
+        result_id = uuid.uuid4().hex
+        self._save(result_id, {
+            "idea": idea,
+            "style": style,
+            "extensions": extensions,
+            "domains": list(available_domains),
+            "rounds": 0
+        })
+        self._prune()
+        return result_id
+
+    @contextmanager
+    def open_entry(self, result_id):
+        """
+        Lock and load a result set for the duration of the block, yielding
+        None if it is unknown or expired. Changes to the entry are written
+        back on exit, which also renews its ttl.
+        """
+        if not self.ID_PATTERN.match(result_id or ""):
+            yield None
+            return
+
+        with self._locked(result_id):
+            path = self._path(result_id, ".json")
+            try:
+                expired = time.time() - os.path.getmtime(path) > self.ttl
+                if not expired:
+                    with open(path, encoding="utf-8") as handle:
+                        entry = json.load(handle)
+            except (OSError, ValueError):
+                yield None
+                return
+            if expired:
+                self._remove(result_id)
+                yield None
+                return
+
+            yield entry
+            self._save(result_id, entry)
+
+    def has_more(self, entry, offset):
+        # Unknown rows on earlier pages are carried into a later one once settled
+        return (
+            offset < len(entry["domains"])
+            or entry["rounds"] < self.max_rounds
+            or any(domain_obj["status"] == "unknown" for domain_obj in entry["domains"])
+        )
+
+    @staticmethod
+    def status_counts(entry, offset=0):
+        """Count available and unknown results from offset onwards"""
+        counts = {"available": 0, "unknown": 0}
+        for domain_obj in entry["domains"][offset:]:
+            if domain_obj["status"] in counts:
+                counts[domain_obj["status"]] += 1
+        return counts
+
+    @classmethod
+    def remaining_counts(cls, entry, offset):
+        """Count available results from offset onwards, and unknown ones anywhere in the set"""
+        return {
+            "available": cls.status_counts(entry, offset)["available"],
+            "unknown": cls.status_counts(entry)["unknown"]
+        }
+
+    @staticmethod
+    def resolve_unknown(entry, offset):
+        """
+        Settle "unknown" results using checks that have finished since. From
+        offset onwards available ones are kept and taken ones dropped. Rows
+        before offset were already served while unknown, so they are settled
+        in place and the newly available ones are returned, to be carried
+        into the next page.
+        """
+        carried = []
+        tail = []
+        for index, domain_obj in enumerate(entry["domains"]):
+            if domain_obj["status"] == "unknown":
+                with cache_lock:
+                    is_available = domain_cache.get(domain_obj["domain"])
+                if index < offset and is_available is not None:
+                    domain_obj["status"] = "available" if is_available else "taken"
+                    if is_available:
+                        carried.append(domain_obj)
+                elif is_available is False:
+                    continue
+                elif is_available:
+                    domain_obj = {"domain": domain_obj["domain"], "status": "available"}
+            if index >= offset:
+                tail.append(domain_obj)
+        entry["domains"][offset:] = tail
+        return carried
+
+    @staticmethod
+    def recheck_unknown(entry):
+        """
+        Queue lookups for results that are still unknown. The worker serving
+        this page may not be the one that ran the original checks, so their
+        answers may never reach its domain_cache otherwise.
+        """
+        with cache_lock:
+            waiting = deque(
+                domain_obj["domain"] for domain_obj in entry["domains"]
+                if domain_obj["status"] == "unknown" and domain_obj["domain"] not in domain_cache
+            )
+        if waiting:
+            threading.Thread(
+                target=_drain_checks, args=(waiting, [], WHOIS_CONCURRENCY_PER_REQUEST),
+                name="whois-drain", daemon=True
+            ).start()
+
+    def page(self, entry, offset, limit):
+        """
+        Return (items, next_offset or None) for an entry from open_entry,
+        generating more results if the page runs past the end. Earlier rows
+        that have turned out available since they were served come first.
+        """
+        carried = self.resolve_unknown(entry, offset)
+        while offset + limit > len(entry["domains"]) and entry["rounds"] < self.max_rounds:
+            entry["rounds"] += 1
+            print(f"Result set exhausted at {len(entry['domains'])}, running generation round {entry['rounds']}")
+
+            known = {domain_obj["domain"] for domain_obj in entry["domains"]}
+            more_domains = run_suggestion_pipeline(entry["idea"], entry["style"], entry["extensions"])
+            new_domains = [domain_obj for domain_obj in more_domains if domain_obj["domain"] not in known]
+            entry["domains"].extend(new_domains)
+            carried.extend(self.resolve_unknown(entry, offset))
+
+            if not new_domains:
+                # Nothing new came back; further rounds are unlikely to help
+                entry["rounds"] = self.max_rounds
+
+        self.recheck_unknown(entry)
+        items = entry["domains"][offset:offset + limit]
+        next_offset = offset + len(items)
+        return carried + items, next_offset if self.has_more(entry, next_offset) else None
+
+result_store = ResultStore()
+
+
+def encode_domains(domains, fmt="rows"):
+    """
+    Encode domain results for a response: "rows" is the list of dicts,
+    "columnar" is one list per field, which avoids repeating the keys.
+    """
+    if fmt == "columnar":
+        return {
+            "domain": [domain_obj["domain"] for domain_obj in domains],
+            "status": [domain_obj["status"] for domain_obj in domains]
+        }
+    return domains
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, used when it is installed"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # ---- Flask ----
 app = Flask(__name__, static_folder="static", template_folder="templates")
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = STATIC_MAX_AGE
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+
+@app.after_request
+def compress_response(response):
+    """Compress text responses with brotli or gzip, per Accept-Encoding"""
+    if (response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "Content-Encoding" in response.headers):
+        return response
+
+    # Honour quality values: "gzip;q=0" means gzip is not acceptable
+    encoding = request.accept_encodings.best_match(["br", "gzip"] if brotli is not None else ["gzip"])
+    if encoding is None:
+        return response
+
+    # Static files are streamed from disk (direct passthrough, which also skips
+    # close callbacks); the body gets replaced, so close the file explicitly
+    response.direct_passthrough = False
+    original = response.response
+    if hasattr(original, "close"):
+        response.call_on_close(original.close)
+
+    cache_key = None
+    compressed = None
+    if request.endpoint == "static":
+        cache_key = (request.path, response.get_etag()[0], encoding)
+        with compressed_static_lock:
+            compressed = compressed_static.get(cache_key)
+
+    if compressed is None:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+
+        start_time = time.perf_counter()
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=min(COMPRESS_LEVEL, 11))
+        else:
+            compressed = gzip.compress(data, compresslevel=COMPRESS_LEVEL)
+
+        if cache_key is not None:
+            with compressed_static_lock:
+                compressed_static[cache_key] = compressed
+
+        if request.path.startswith("/api/"):
+            print(
+                f"Compressed {request.path}: {len(data)} -> {len(compressed)} bytes "
+                f"({encoding}, {(time.perf_counter() - start_time) * 1000:.1f} ms)"
+            )
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+
+    # The body now depends on the encoding, so a strong ETag no longer holds
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
 
 
 @app.route("/")
 def index():
-    return render_template("index.html")
+    response = app.make_response(render_template("index.html"))
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @app.route("/api/suggest-fast", methods=["POST"])
@@ -399,6 +1453,9 @@ def api_suggest_fast():
     idea = data.get("idea", "")
     style = data.get("style", "default")
     extensions = data.get("extensions", [])
+    fmt = data.get("format", "rows")
+    # Domains the client already shows, sent when it rebuilds an expired result set
+    exclude = set(data.get("exclude") or [])
 
     print(f"Received fast request - Idea: '{idea}', Style: '{style}', Extensions: {extensions}")
 
@@ -406,44 +1463,56 @@ def api_suggest_fast():
         extensions = [ext if ext.startswith('.') else f'.{ext}' for ext in extensions]
 
     try:
-        # Generate domains quickly with style
-        print(f"Starting fast domain generation with {style} style...")
-        raw_domains = suggest_domains(idea, style, extensions, N_SUGGESTIONS)
-        print(f"Generated {len(raw_domains)} raw domains")
-
-        # Collect all domains to check (main + alternatives)
-        all_domains_to_check = []
-
-        for domain_obj in raw_domains:
-            main_domain = domain_obj["domain"]
-            all_domains_to_check.append(main_domain)
-
-        print(f"Checking availability for {len(all_domains_to_check)} domains in parallel...")
-
-        # Check all domains in parallel with higher concurrency
-        availability_results = check_domains_parallel_fast(all_domains_to_check, max_workers=15)
-
-        # Filter to only available domains
-        available_domains = []
-
-        for domain, is_available in availability_results.items():
-            if is_available:
-                available_domains.append({
-                    "domain": domain,
-                    "status": "available"
-                })
+        available_domains = None
+        if popular_queries is not None:
+            query_key = popular_queries.key(idea, style, extensions)
+            popular_queries.record(query_key)
+            available_domains = popular_queries.get(query_key)
+            if available_domains is not None:
+                print("Serving popular query from memory")
+
+        if available_domains is None:
+            available_domains = run_suggestion_pipeline(idea, style, extensions)
+            if popular_queries is not None:
+                popular_queries.offer(query_key, available_domains)
+
+        if exclude:
+            available_domains = [
+                domain_obj for domain_obj in available_domains if domain_obj["domain"] not in exclude
+            ]
 
-        available_domains.sort(key=lambda x: x["domain"])
+        result_id = result_store.create(idea, style, extensions, available_domains)
+        with result_store.open_entry(result_id) as entry:
+            # Checks that missed an earlier deadline may have finished by now
+            result_store.resolve_unknown(entry, 0)
+            if exclude:
+                # A rebuild may have filtered out most of the set; top it up to a page
+                result_store.page(entry, 0, PAGE_SIZE)
+            available_domains = list(entry["domains"])
+            counts = result_store.status_counts(entry)
+            next_offset = min(PAGE_SIZE, len(available_domains))
+            remaining = result_store.remaining_counts(entry, next_offset)
+            has_more = result_store.has_more(entry, next_offset) if available_domains or exclude else False
 
         end_time = time.time()
-        print(f"Found {len(available_domains)} available domains in {end_time - start_time:.2f} seconds")
+        print(
+            f"Found {counts['available']} available domains "
+            f"({counts['unknown']} unknown) in {end_time - start_time:.2f} seconds"
+        )
 
-        # Return response with initial batch and more batch
+        # Return the first page; later pages come from /api/results/<result_id>.
+        # "more" keeps the second page inline for older clients.
         response = {
-            "initial": available_domains[:10],  # First 10 available domains
-            "more": available_domains[10:20],  # Next 10 available domains
+            "initial": encode_domains(available_domains[:PAGE_SIZE], fmt),
+            "more": encode_domains(available_domains[PAGE_SIZE:PAGE_SIZE * 2], fmt),
             "total": len(available_domains),
-            "style_used": style
+            "available": counts["available"],
+            "unknown": counts["unknown"],
+            "available_remaining": remaining["available"],
+            "unknown_remaining": remaining["unknown"],
+            "style_used": style,
+            "result_id": result_id,
+            "next_cursor": str(next_offset) if has_more else None
         }
 
         return jsonify(response)
@@ -463,6 +1532,67 @@ def api_suggest_fast():
         }), 500
 
 
+@app.route("/api/results/<result_id>", methods=["GET"])
+def api_results_page(result_id):
+    """Cursor-paginated access to a stored result set"""
+    try:
+        offset = max(int(request.args.get("cursor", 0)), 0)
+        limit = min(max(int(request.args.get("limit", PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({
+            "error": True,
+            "message": "cursor and limit must be integers",
+            "items": [],
+            "next_cursor": None
+        }), 400
+
+    try:
+        with result_store.open_entry(result_id) as entry:
+            if entry is None:
+                return jsonify({
+                    "error": True,
+                    "message": "Result set not found or expired",
+                    "items": [],
+                    "next_cursor": None
+                }), 404
+
+            items, next_offset = result_store.page(entry, offset, limit)
+            counts = result_store.status_counts(entry)
+            total = counts["available"] + counts["unknown"]
+            remaining = result_store.remaining_counts(
+                entry, next_offset if next_offset is not None else len(entry["domains"])
+            )
+    except Exception as error:
+        print(f"ERROR in api_results_page: {str(error)}")
+        import traceback
+        traceback.print_exc()
+
+        return jsonify({
+            "error": True,
+            "message": f"Error: {str(error)}",
+            "items": [],
+            "next_cursor": None
+        }), 500
+
+    response = jsonify({
+        "result_id": result_id,
+        "items": encode_domains(items, request.args.get("format", "rows")),
+        "next_cursor": str(next_offset) if next_offset is not None else None,
+        "total": total,
+        "available": counts["available"],
+        "unknown": counts["unknown"],
+        "available_remaining": remaining["available"],
+        "unknown_remaining": remaining["unknown"]
+    })
+
+    # Pages only change when a generation round appends results, so clients
+    # can revalidate cheaply with If-None-Match
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
+
+
 # Keep the old endpoints for backward compatibility
 @app.route("/api/suggest", methods=["POST"])
 def api_suggest():
@@ -471,4 +1601,6 @@ def api_suggest():
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=int(os.getenv("PORT", 5000)))
\ No newline at end of file
+    # Development server only; production runs through wsgi.py (see gunicorn.conf.py)
+    init_worker()
+    app.run(debug=os.getenv("FLASK_DEBUG", "1") == "1", port=int(os.getenv("PORT", 5000)))
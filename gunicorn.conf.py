@@ -0,0 +1,29 @@
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Requests spend most of their time waiting on Gemini and WHOIS sockets, so a
+# few processes with several threads each go further than many single-thread
+# workers.
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+worker_class = "gthread"
+
+# Generation plus availability checks can take a while on slow registries.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app once in the master before forking. The Gemini client (grpc)
+# is not fork-safe, so it is built per worker in post_fork instead.
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    from app import init_worker
+
+    init_worker()
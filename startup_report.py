@@ -0,0 +1,79 @@
+"""
+Startup-time report: import-time breakdown for the app module.
+
+    python startup_report.py [--top 20]
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and lists
+the slowest imports by cumulative time, then times the dependencies that
+app.py defers until first use (see lazy_import in app.py).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules app.py imports lazily; they must not show up in the eager breakdown
+LAZY_MODULES = ["google.generativeai"]
+
+
+def import_breakdown(module="app"):
+    """Return [(cumulative_us, self_us, name)] for one fresh `import module`"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def _run_timed(code):
+    start_time = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True)
+    return time.perf_counter() - start_time, proc.returncode == 0
+
+
+def lazy_import_costs():
+    """Time each deferred dependency in a fresh interpreter, minus interpreter startup"""
+    baseline, _ = _run_timed("pass")
+    costs = {}
+    for module in LAZY_MODULES:
+        elapsed, ok = _run_timed(f"import {module}")
+        costs[module] = max(elapsed - baseline, 0.0) if ok else None
+    return costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=20, help="number of imports to list")
+    args = parser.parse_args()
+
+    rows = import_breakdown()
+    app_row = next(row for row in rows if row[2].strip() == "app")
+    print(f"import app: {app_row[0] / 1e6:.3f} s cumulative\n")
+
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1e3:>10.1f}ms {self_us / 1e3:>8.1f}ms  {name}")
+
+    loaded = {name.strip() for _, _, name in rows}
+    print("\nDeferred until first use:")
+    for module, elapsed in lazy_import_costs().items():
+        status = "LOADED EAGERLY" if module in loaded else "lazy"
+        cost = f"{elapsed:.3f} s" if elapsed is not None else "not installed"
+        print(f"  {module}: {cost} ({status})")
+
+
+if __name__ == "__main__":
+    main()
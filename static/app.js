@@ -18,7 +18,10 @@ const styleSelector = document.getElementById("styleSelector")
 const themeToggle = document.getElementById("themeToggle")
 const themeIcon = themeToggle.querySelector(".theme-icon")
 
-let moreDomains = [] // Store additional domains for "Load More"
+let resultId = null // Server-side result set for "Load More"
+let nextCursor = null // Cursor of the next page, null when there is nothing left
+let resultQuery = null // Idea, style and extensions of the current result set
+let shownDomains = new Set() // Domains already shown for the current result set
 let isLoadingMore = false
 let selectedStyle = "default" // Default selected style
 const decodingInterval = null
@@ -283,6 +286,8 @@ function filterDomainsByExtensions(domains, selectedExts) {
   const seen = new Set()
   const filtered = []
   domains.forEach((d) => {
+    // Skip domains whose availability check has not finished yet
+    if (d.status && d.status !== "available") return
     // Use the new robust extension extractor
     const mainExt = extractExtension(d.domain)
     if (selectedExts.includes(mainExt) && !seen.has(d.domain)) {
@@ -424,7 +429,9 @@ form.addEventListener("submit", async (e) => {
   loadingIcon.className = "fas fa-spinner fa-spin loading-icon"
   generateBtn.disabled = true
   loadMoreSection.style.display = "none"
-  moreDomains = []
+  resultId = null
+  nextCursor = null
+  shownDomains = new Set()
   results.innerHTML = ""
   resultsTitle.style.display = "none"
   emptyState.style.display = "none"
@@ -446,10 +453,14 @@ form.addEventListener("submit", async (e) => {
 
     const data = await response.json()
     const initialDomains = filterDomainsByExtensions(data.initial, selectedExts)
-    moreDomains = filterDomainsByExtensions(data.more, selectedExts)
-    const allSuggestions = [...initialDomains, ...moreDomains]
-
-    if (allSuggestions.length === 0) {
+    resultId = data.result_id
+    nextCursor = data.next_cursor
+    resultQuery = { idea, style: selectedStyle, extensions: selectedExts }
+    initialDomains.forEach((domainObj) => shownDomains.add(domainObj.domain))
+
+    // Nothing to show yet, but later pages may still have results (e.g. checks
+    // that were still running), so only give up when there is no next page
+    if (initialDomains.length === 0 && nextCursor === null) {
       hideAIThinking()
       resultsTitle.style.display = "none"
       results.innerHTML = `
@@ -467,11 +478,7 @@ form.addEventListener("submit", async (e) => {
 
     await displayAvailableDomainsStreaming(initialDomains)
 
-    if (moreDomains.length > 0) {
-      loadMoreSection.style.display = "block"
-      moreCount.textContent = `(${moreDomains.length} available)`
-      loadMoreBtn.disabled = false
-    }
+    updateLoadMore(data)
   } catch (error) {
     console.error("Error:", error)
     hideAIThinking()
@@ -491,17 +498,67 @@ form.addEventListener("submit", async (e) => {
   }
 })
 
+// Show the "Load More" button while the server has further pages
+function updateLoadMore(data) {
+  if (!resultId || nextCursor === null) {
+    loadMoreSection.style.display = "none"
+    return
+  }
+
+  const counts = []
+  if (data.available_remaining > 0) counts.push(`${data.available_remaining} available`)
+  if (data.unknown_remaining > 0) counts.push(`${data.unknown_remaining} still checking`)
+  loadMoreSection.style.display = "block"
+  moreCount.textContent = counts.length > 0 ? `(${counts.join(", ")})` : ""
+  loadMoreBtn.disabled = false
+}
+
 loadMoreBtn.addEventListener("click", async () => {
-  if (isLoadingMore || moreDomains.length === 0) return
+  if (isLoadingMore || !resultId || nextCursor === null) return
   isLoadingMore = true
   const originalText = loadMoreBtn.innerHTML
   loadMoreBtn.disabled = true
   loadMoreBtn.innerHTML = `<i class="fas fa-spinner fa-spin"></i> Loading...`
 
-  await displayAvailableDomainsStreaming(moreDomains)
+  try {
+    let response = await fetch(`/api/results/${resultId}?cursor=${nextCursor}&limit=10`)
+    let items
+    let data
+
+    if (response.status === 404) {
+      // The result set expired or was pruned: start a new one for the same
+      // query, leaving out the domains that are already on the page
+      response = await fetch("/api/suggest-fast", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ ...resultQuery, exclude: [...shownDomains] }),
+      })
+      if (!response.ok) throw new Error(`Network error: ${response.statusText}`)
+      data = await response.json()
+      resultId = data.result_id
+      items = data.initial
+    } else {
+      if (!response.ok) throw new Error(`Network error: ${response.statusText}`)
+      data = await response.json()
+      items = data.items
+    }
 
-  loadMoreSection.style.display = "none"
-  moreDomains = []
-  isLoadingMore = false
-  loadMoreBtn.innerHTML = originalText
+    nextCursor = data.next_cursor
+    // Unknown rows are skipped here; the server carries them into a later
+    // page once their check finds them available
+    const newDomains = filterDomainsByExtensions(items, resultQuery.extensions).filter(
+      (domainObj) => !shownDomains.has(domainObj.domain),
+    )
+    newDomains.forEach((domainObj) => shownDomains.add(domainObj.domain))
+
+    await displayAvailableDomainsStreaming(newDomains)
+    updateLoadMore(data)
+  } catch (error) {
+    // Keep the cursor so the next click retries the same page
+    console.error("Error:", error)
+    loadMoreBtn.disabled = false
+  } finally {
+    isLoadingMore = false
+    loadMoreBtn.innerHTML = originalText
+  }
 })
\ No newline at end of file
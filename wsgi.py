@@ -0,0 +1,11 @@
+"""
+Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is imported once in the master (preload_app) and each forked worker
+runs init_worker() from the post_fork hook in gunicorn.conf.py.
+"""
+from app import app
+
+__all__ = ["app"]